@@ -0,0 +1,752 @@
+"""
+Core logic for the Resume Aware Interview Assistant.
+-----------------------------------------------------
+Dependency loading, resume parsing, ChatGPT answering, speech capture and playback.
+Streamlit re-executes only the page script on each rerun, so keeping this in an
+imported module means it is set up once per process.
+"""
+
+import asyncio
+import atexit
+import collections
+import hashlib
+import importlib
+import io
+import os
+import platform
+import queue
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import types
+
+import streamlit as st
+
+
+# ------------------ DEPENDENCY LOAD ------------------
+def _optional_import(module_name, attribute=None):
+    """Import a module (or one of its attributes), returning None if missing."""
+    try:
+        module = importlib.import_module(module_name)
+    except (ImportError, OSError, RuntimeError):
+        # Native packages (e.g. llama_cpp) raise these when their library fails to load.
+        return None
+    return getattr(module, attribute, None) if attribute else module
+
+
+@st.cache_resource(show_spinner=False)
+def load_libraries():
+    """Import the optional dependencies once per process instead of per rerun."""
+    return types.SimpleNamespace(
+        openai=_optional_import("openai"),
+        AsyncOpenAI=_optional_import("openai", "AsyncOpenAI"),
+        sr=_optional_import("speech_recognition"),
+        gTTS=_optional_import("gtts", "gTTS"),
+        gtts_tts=_optional_import("gtts.tts"),
+        requests=_optional_import("requests"),
+        HTTPAdapter=_optional_import("requests.adapters", "HTTPAdapter"),
+        PdfReader=_optional_import("pypdf", "PdfReader"),
+        fitz=_optional_import("fitz"),
+        WhisperModel=_optional_import("faster_whisper", "WhisperModel"),
+        Llama=_optional_import("llama_cpp", "Llama"),
+    )
+
+
+libs = load_libraries()
+openai = libs.openai
+sr = libs.sr
+gTTS = libs.gTTS
+PdfReader = libs.PdfReader
+fitz = libs.fitz
+WhisperModel = libs.WhisperModel
+Llama = libs.Llama
+
+
+@st.cache_resource(show_spinner=False)
+def runtime_mode():
+    """Probe the environment once per process and describe what it supports."""
+    return types.SimpleNamespace(
+        is_cloud=(
+            os.getenv("STREAMLIT_RUNTIME_ENV") == "cloud"
+            or sr is None
+            or not hasattr(sr, "Microphone")
+        ),
+        all_libs_loaded=all([openai, sr, gTTS, PdfReader]),
+    )
+
+
+MODE = runtime_mode()
+
+
+# ------------------ CONFIGURATION ------------------
+if openai:
+    try:
+        openai.api_key = st.secrets["OPENAI_API_KEY"]
+    except Exception:
+        openai.api_key = os.getenv("OPENAI_API_KEY", "YOUR_API_KEY_HERE")
+
+SYSTEM_PROMPT = (
+    "You are the candidate in the resume below; I am the interviewer. Answer only what is "
+    "asked, with no intro. For coding questions give code, a brief explanation, and time and "
+    "space complexity, and vary the solution if the question is repeated."
+)
+
+RESUME_SUMMARY_PROMPT = "Summarize this resume into <=400 tokens of bullet facts:\n"
+
+# Platform player for audio files, resolved once at import.
+_FILE_PLAYER = {
+    "windows": ["cmd", "/c", "start", ""],
+    "darwin": ["afplay"],
+}.get(platform.system().lower(), ["xdg-open"])  # Linux/other
+
+# Players that can decode MP3 from stdin, in order of preference.
+PIPE_PLAYER_COMMANDS = [
+    ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet", "-i", "-"],
+    ["mpv", "--no-video", "--really-quiet", "-"],
+]
+_PIPE_PLAYER = next((cmd for cmd in PIPE_PLAYER_COMMANDS if shutil.which(cmd[0])), None)
+# Whether waiting on the player process means waiting for playback to end.
+_WAITABLE_PLAYER = bool(_PIPE_PLAYER) or _FILE_PLAYER[0] == "afplay"
+
+# Optional local GGUF chat model (e.g. an int4 Q4_K_M build) for local runs.
+LOCAL_LLM_MODEL_PATH = os.getenv("LOCAL_LLM_MODEL_PATH")
+USE_LOCAL_LLM = bool(Llama and LOCAL_LLM_MODEL_PATH and not MODE.is_cloud)
+
+WHISPER_MODEL_SIZE = "base.en"
+MAX_CONCURRENT_REQUESTS = 8
+ANSWER_CACHE_TTL_SECONDS = 3600
+ANSWER_CACHE_MAX_ENTRIES = 256
+STREAM_REFRESH_SECONDS = 0.05
+QUICK_LISTEN_POLL_SECONDS = 0.2
+QUICK_LISTEN_TIMEOUT_SECONDS = 30
+TEMP_AUDIO_MAX_AGE_SECONDS = 600
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+_INLINE_SPACE_RE = re.compile(r"[ \t]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+# ------------------ CORE FUNCTIONS ------------------
+def _answer_cache_key(question, resume_text):
+    """Build the answer cache key for a question asked against a resume."""
+    resume_hash = hashlib.sha1(resume_text.encode("utf-8")).hexdigest()
+    return resume_hash, " ".join(question.lower().split())
+
+
+class SharedAnswerCache:
+    """Answers shared across sessions, expiring after a TTL, oldest evicted first."""
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, answer = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return answer
+
+    def put(self, key, answer):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), answer)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+@st.cache_resource(show_spinner=False)
+def get_shared_answer_cache():
+    """Return the process-wide cache of first answers to each question."""
+    return SharedAnswerCache(ANSWER_CACHE_TTL_SECONDS, ANSWER_CACHE_MAX_ENTRIES)
+
+
+@st.cache_data(show_spinner=False)
+def _parse_resume(data, file_type):
+    """Parse raw resume bytes into text; cached on the file contents."""
+    if file_type == "application/pdf":
+        buffer = io.StringIO()
+        if fitz:
+            with fitz.open(stream=data, filetype="pdf") as doc:
+                for page in doc:
+                    buffer.write(page.get_text())
+                    buffer.write("\n")
+        else:
+            for page in PdfReader(io.BytesIO(data)).pages:
+                buffer.write(page.extract_text() or "")
+                buffer.write("\n")
+        text = buffer.getvalue()
+    else:
+        text = data.decode("utf-8", errors="ignore")
+    # Collapse runs of spaces/tabs and blank lines left over from PDF layout.
+    return _BLANK_LINES_RE.sub("\n\n", _INLINE_SPACE_RE.sub(" ", text)).strip()
+
+
+def extract_resume_text(uploaded_file):
+    """Extract text from uploaded resume (supports PDF and text)."""
+    if uploaded_file.type == "application/pdf" and not (fitz or PdfReader):
+        st.error("PDF reading is unavailable in this environment.")
+        return None
+    try:
+        data = uploaded_file.getvalue()
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        if st.session_state.get("resume_digest") == digest:
+            return st.session_state.get("resume_text")
+        text = _parse_resume(data, uploaded_file.type)
+    except Exception as exc:
+        st.error(f"Could not read resume: {exc}")
+        return None
+    st.session_state["resume_digest"] = digest
+    return text
+
+
+@st.cache_resource(show_spinner=False)
+def get_openai_runtime():
+    """Start one event loop thread shared by every session's OpenAI requests.
+
+    All sessions submit to the same loop and ``AsyncOpenAI`` client, so
+    concurrent questions share one connection pool instead of a thread each.
+    """
+    if not libs.AsyncOpenAI:
+        raise RuntimeError("openai>=1.0.0 is required for the AsyncOpenAI client.")
+    # Build everything before starting the thread, so a failure leaks no loop.
+    client = libs.AsyncOpenAI(api_key=openai.api_key)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return types.SimpleNamespace(loop=loop, client=client, semaphore=semaphore)
+
+
+@st.cache_resource(show_spinner="Loading local model...")
+def load_local_llm():
+    """Load the local llama.cpp model once; the lock serializes generation."""
+    llm = Llama(model_path=LOCAL_LLM_MODEL_PATH, n_gpu_layers=-1, n_ctx=4096, verbose=False)
+    return types.SimpleNamespace(llm=llm, lock=threading.Lock())
+
+
+def _stream_local_completion(messages):
+    """Yield reply tokens from the local llama.cpp model."""
+    local = load_local_llm()
+    with local.lock:
+        for chunk in local.llm.create_chat_completion(messages=messages, stream=True):
+            token = chunk["choices"][0]["delta"].get("content")
+            if token:
+                yield token
+
+
+def stream_chat_completion(model, messages):
+    """Yield reply tokens for a chat completion run on the shared event loop.
+
+    When a local model is configured, ``model`` is ignored and the reply is
+    generated on this machine instead.
+    """
+    if USE_LOCAL_LLM:
+        yield from _stream_local_completion(messages)
+        return
+
+    runtime = get_openai_runtime()
+    tokens = queue.Queue()
+
+    async def produce():
+        try:
+            async with runtime.semaphore:
+                stream = await runtime.client.chat.completions.create(
+                    model=model, messages=messages, stream=True
+                )
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        tokens.put(chunk.choices[0].delta.content)
+        except Exception as exc:
+            tokens.put(exc)
+        finally:
+            tokens.put(None)
+
+    future = asyncio.run_coroutine_threadsafe(produce(), runtime.loop)
+    try:
+        while (token := tokens.get()) is not None:
+            if isinstance(token, Exception):
+                raise token
+            yield token
+    finally:
+        # Stop the request if the consumer quits early (e.g. a rerun or error).
+        future.cancel()
+
+
+@st.cache_data(show_spinner="Summarizing resume...")
+def _summarize_resume(resume_text):
+    """Summarize a resume once per process so every session keys answers alike."""
+    messages = [{"role": "user", "content": RESUME_SUMMARY_PROMPT + resume_text}]
+    return "".join(stream_chat_completion("gpt-4o-mini", messages)).strip()
+
+
+def summarize_resume(resume_text):
+    """Condense the resume once per upload; falls back to the full text."""
+    if not (openai or USE_LOCAL_LLM):
+        return resume_text
+    resume_hash = hashlib.sha1(resume_text.encode("utf-8")).hexdigest()
+    # Remember a failure so later reruns do not retry on every click.
+    if st.session_state.get("resume_summary_failed") == resume_hash:
+        return resume_text
+
+    try:
+        return _summarize_resume(resume_text)
+    except Exception as exc:
+        st.warning(f"Could not summarize resume, using full text: {exc}")
+        st.session_state["resume_summary_failed"] = resume_hash
+        return resume_text
+
+
+def get_chatgpt_answer(question, resume_text, placeholder=None, on_sentence=None, regenerate=False):
+    """Send question + resume context to ChatGPT and return the answer.
+
+    The reply is streamed: partial text is rendered into ``placeholder`` as it
+    arrives and each completed sentence is handed to ``on_sentence``. Cached
+    answers are reused unless ``regenerate`` asks for a fresh one.
+    """
+    if not resume_text:
+        st.warning("Please upload a resume first so responses are contextual.")
+        return None
+    if not (openai or USE_LOCAL_LLM):
+        st.error("No answer model is available. Install openai or configure a local model.")
+        return None
+
+    answer_cache = st.session_state.setdefault("answer_cache", {})
+    shared_cache = get_shared_answer_cache()
+    cache_key = _answer_cache_key(question, resume_text)
+    answer = None
+    if not regenerate:
+        answer = answer_cache.get(cache_key) or shared_cache.get(cache_key)
+    if answer:
+        answer_cache[cache_key] = answer
+        if on_sentence:
+            on_sentence(answer)
+        return answer
+
+    # System prompt, resume, then question. The summarized prefix stays well
+    # under the 1024 tokens OpenAI needs before it caches a prompt prefix, so
+    # the saving comes from sending fewer tokens, not from server-side caching.
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "system", "content": f"Resume:\n{resume_text}"},
+        {"role": "user", "content": question},
+    ]
+
+    answer = ""
+    pending = ""
+    last_render = 0.0
+    try:
+        for token in stream_chat_completion("gpt-4o", messages):
+            answer += token
+            if placeholder and time.monotonic() - last_render >= STREAM_REFRESH_SECONDS:
+                placeholder.markdown(answer + "▌")
+                last_render = time.monotonic()
+            if on_sentence:
+                *sentences, pending = _SENTENCE_END_RE.split(pending + token)
+                for sentence in sentences:
+                    on_sentence(sentence)
+    except Exception as exc:
+        st.error(f"Answer generation failed: {exc}")
+        return None
+
+    if on_sentence and pending.strip():
+        on_sentence(pending.strip())
+    answer = answer.strip()
+
+    answer_cache[cache_key] = answer
+    shared_cache.put(cache_key, answer)
+    return answer
+
+
+@st.cache_resource(show_spinner=False)
+def use_pooled_gtts_session():
+    """Route gTTS through one keep-alive session so TLS setup is paid once.
+
+    gTTS opens (and closes) a new ``requests.Session`` per request; its module
+    gets a ``requests`` namespace whose ``Session`` hands back a shared one.
+    """
+
+    class KeepAliveSession(libs.requests.Session):
+        def __exit__(self, *args):
+            pass  # Keep pooled connections open for the next request.
+
+    session = KeepAliveSession()
+    session.mount("https://", libs.HTTPAdapter(pool_connections=4, pool_maxsize=4))
+    libs.gtts_tts.requests = types.SimpleNamespace(**vars(libs.requests))
+    libs.gtts_tts.requests.Session = lambda: session
+    return session
+
+
+# Caps concurrent gTTS requests across all sessions at the pooled session's size.
+_TTS_FETCH_SLOTS = threading.BoundedSemaphore(4)
+
+
+def fetch_speech(text):
+    """Convert text to MP3 bytes with gTTS, entirely in memory."""
+    buffer = io.BytesIO()
+    with _TTS_FETCH_SLOTS:
+        gTTS(text).write_to_fp(buffer)
+    return buffer.getvalue()
+
+
+def play_stream(chunks):
+    """Pipe MP3 chunks into the stdin player as they arrive; returns the process."""
+    process = subprocess.Popen(
+        _PIPE_PLAYER,
+        stdin=subprocess.PIPE,
+        bufsize=0,  # Hand each chunk to the player as soon as it is written.
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        for chunk in chunks:
+            process.stdin.write(chunk)
+    finally:
+        process.stdin.close()
+    return process
+
+
+_temp_audio_files = collections.deque()
+_temp_audio_lock = threading.Lock()
+
+
+@atexit.register
+def _remove_temp_audio_files(max_age=0):
+    """Delete tracked temporary audio files at least ``max_age`` seconds old."""
+    now = time.monotonic()
+    failed = []
+    with _temp_audio_lock:
+        while _temp_audio_files and now - _temp_audio_files[0][0] >= max_age:
+            entry = _temp_audio_files.popleft()
+            try:
+                os.remove(entry[1])
+            except FileNotFoundError:
+                pass
+            except OSError:
+                # Windows refuses while the player still has it open; retry later.
+                failed.append(entry)
+        _temp_audio_files.extendleft(reversed(failed))
+
+
+def play_audio(audio):
+    """Play MP3 bytes, returning once the player no longer needs them.
+
+    Audio is piped to a stdin player when one is installed. Otherwise it goes
+    through a temporary file for the platform player: afplay is waited on and
+    the file deleted; handoff players (start, xdg-open) return at once and may
+    still be reading, so their files are swept once they are old enough.
+    """
+    if _PIPE_PLAYER:
+        play_stream([audio]).wait()
+        return
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as fp:
+        fp.write(audio)
+    process = subprocess.Popen(
+        _FILE_PLAYER + [fp.name],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        close_fds=True,
+    )
+    if _WAITABLE_PLAYER:
+        process.wait()
+        try:
+            os.remove(fp.name)
+        except OSError:
+            pass
+        return
+    _remove_temp_audio_files(TEMP_AUDIO_MAX_AGE_SECONDS)
+    with _temp_audio_lock:
+        _temp_audio_files.append((time.monotonic(), fp.name))
+
+
+if gTTS:
+    use_pooled_gtts_session()
+
+
+def _start_thread(target, *args):
+    """Start a daemon thread for background speech work."""
+    threading.Thread(target=target, args=args, daemon=True).start()
+
+
+def background_errors():
+    """Return this session's list of errors raised by background threads.
+
+    Those threads outlive the script run that started them, so they append
+    messages here instead of calling ``st`` and the next run shows them.
+    """
+    return st.session_state.setdefault("background_errors", [])
+
+
+def show_background_errors():
+    """Show, then forget, the errors collected since the previous run."""
+    errors = background_errors()
+    while errors:
+        st.warning(errors.pop(0))
+
+
+def _start_stage(inbox, handle, error_message, errors, outbox=None, finished=None):
+    """Run ``handle`` on every item from ``inbox`` in a background thread.
+
+    Results are forwarded to ``outbox``; a ``None`` item stops the stage and is
+    passed on so the next stage stops too. Failures are appended to ``errors``
+    prefixed with ``error_message`` and the item is skipped. The ``finished``
+    event, if given, is set once the stage has stopped.
+    """
+
+    def run():
+        while True:
+            item = inbox.get()
+            if item is None:
+                break
+            try:
+                result = handle(item)
+            except Exception as exc:
+                errors.append(f"{error_message}: {exc}")
+                continue
+            if outbox is not None:
+                outbox.put(result)
+        if outbox is not None:
+            outbox.put(None)
+        if finished is not None:
+            finished.set()
+
+    _start_thread(run)
+
+
+def _join_sentences(inbox, outbox):
+    """Forward everything from ``inbox`` as one text once it is finished."""
+    sentences = []
+    while (sentence := inbox.get()) is not None:
+        sentences.append(sentence)
+    if sentences:
+        outbox.put(" ".join(sentences))
+    outbox.put(None)
+
+
+def _stream_speech(text, recording, errors):
+    """Fetch speech for ``text`` in the background and iterate over its chunks.
+
+    Playback can start on the first MP3 chunk while the rest of the sentence,
+    and the next sentences, are still downloading. Chunks are also appended to
+    ``recording`` for replay.
+    """
+    chunks = queue.Queue()
+
+    def fetch():
+        try:
+            with _TTS_FETCH_SLOTS:
+                for chunk in gTTS(text).stream():
+                    recording.append(chunk)
+                    chunks.put(chunk)
+        except Exception as exc:
+            errors.append(f"Speech synthesis failed: {exc}")
+        finally:
+            chunks.put(None)
+
+    _start_thread(fetch)
+    return iter(chunks.get, None)
+
+
+def start_speech_worker():
+    """Start the sentence -> speech -> playback pipeline.
+
+    Synthesis and playback run on separate threads, so the next sentence is
+    converted while the previous one is still playing; with a stdin player each
+    sentence is piped in as its first chunks arrive. Platform players that
+    return before playback ends would overlap sentences, so with those the
+    whole answer is spoken once it is complete. The synthesized audio is
+    kept in ``st.session_state["last_audio"]`` for replay. Returns the queue to
+    feed; put ``None`` on it to stop the pipeline.
+    """
+    sentences = queue.Queue()
+    if not gTTS:
+        st.warning("Speech playback is unavailable in this environment.")
+        return sentences
+    recording = st.session_state["last_audio"] = []
+    errors = background_errors()
+
+    if _PIPE_PLAYER:
+
+        def synthesize(text):
+            parts = []
+            recording.append(parts)
+            return _stream_speech(text, parts, errors)
+
+        def play(chunks):
+            play_stream(chunks).wait()
+
+    else:
+
+        def synthesize(text):
+            audio = fetch_speech(text)
+            recording.append([audio])
+            return audio
+
+        play = play_audio
+
+    texts = sentences
+    if not _WAITABLE_PLAYER:
+        texts = queue.Queue()
+        _start_thread(_join_sentences, sentences, texts)
+    # Synthesis runs at most one sentence ahead of playback.
+    audio_queue = queue.Queue(maxsize=1)
+    _start_stage(texts, synthesize, "Speech synthesis failed", errors, audio_queue)
+    _start_stage(
+        audio_queue, play, "Speech playback not available", errors, finished=_start_playback()
+    )
+    return sentences
+
+
+def _start_playback():
+    """Mark this session as speaking; returns the event to set when it stops."""
+    finished = st.session_state["playback_finished"] = threading.Event()
+    return finished
+
+
+def is_speaking():
+    """Return True while this session's answer or replay is still playing."""
+    finished = st.session_state.get("playback_finished")
+    return finished is not None and not finished.is_set()
+
+
+def replay_last_answer():
+    """Play the last spoken answer again from memory, without new synthesis."""
+    recording = st.session_state.get("last_audio")
+    if not recording:
+        st.info("Nothing to replay yet.")
+        return
+    if is_speaking():
+        st.info("Still speaking. Replay once playback has finished.")
+        return
+    audio_queue = queue.Queue()
+    audio_queue.put(b"".join(chunk for parts in recording for chunk in parts))
+    audio_queue.put(None)
+    _start_stage(
+        audio_queue,
+        play_audio,
+        "Speech playback not available",
+        background_errors(),
+        finished=_start_playback(),
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def load_whisper_model():
+    """Load the int8-quantized local Whisper model once per process."""
+    return WhisperModel(WHISPER_MODEL_SIZE, device="auto", compute_type="int8")
+
+
+def transcribe_audio(recognizer, audio):
+    """Transcribe captured audio locally with Whisper, else via Google."""
+    if not WhisperModel:
+        return recognizer.recognize_google(audio)
+    segments, _ = load_whisper_model().transcribe(
+        io.BytesIO(audio.get_wav_data()), beam_size=1, vad_filter=True
+    )
+    return " ".join(segment.text.strip() for segment in segments).strip()
+
+
+@st.cache_resource(show_spinner=False)
+def calibrate_microphone():
+    """Measure ambient noise once per process and return the energy threshold."""
+    recognizer = sr.Recognizer()
+    with sr.Microphone() as source:
+        recognizer.adjust_for_ambient_noise(source, duration=0.3)
+    return recognizer.energy_threshold
+
+
+def _session_microphone():
+    """Return this session's calibrated recognizer and microphone, made once.
+
+    Both are reused for every capture. The audio stream itself is opened per
+    capture and closed afterwards, so the microphone is not held between
+    questions.
+    """
+    if "quick_listen_mic" not in st.session_state:
+        recognizer = sr.Recognizer()
+        recognizer.energy_threshold = calibrate_microphone()
+        st.session_state["quick_listen_mic"] = (recognizer, sr.Microphone())
+    return st.session_state["quick_listen_mic"]
+
+
+def _listen_for_question(listener, recognizer, microphone, errors):
+    """Capture one phrase on a background thread, then release the microphone.
+
+    Each ``listen`` call waits at most a second for speech to start, so the loop
+    can give up at the deadline; once speech has started the whole phrase is
+    recorded, so the timeout only covers the silence before the question.
+    """
+    deadline = time.monotonic() + QUICK_LISTEN_TIMEOUT_SECONDS
+    try:
+        with microphone as source:
+            while time.monotonic() < deadline:
+                try:
+                    listener.audio = recognizer.listen(source, timeout=1, phrase_time_limit=15)
+                    break
+                except sr.WaitTimeoutError:
+                    continue
+    except Exception as exc:
+        errors.append(f"Speech recognition failed: {exc}")
+    finally:
+        listener.done = True
+
+
+def start_quick_listen():
+    """Listen on a background thread for this session's next spoken question.
+
+    The microphone is opened on press, so nothing heard before it can become
+    the question, and it is released after one phrase or when no speech starts
+    before the timeout.
+    """
+    if not sr:
+        st.error("Speech recognition is unavailable in this environment.")
+        return False
+    if is_quick_listening():
+        return True
+    try:
+        recognizer, microphone = _session_microphone()
+    except Exception as exc:
+        st.error(f"Speech recognition failed: {exc}")
+        return False
+    listener = types.SimpleNamespace(done=False, audio=None)
+    _start_thread(_listen_for_question, listener, recognizer, microphone, background_errors())
+    st.session_state["quick_listener"] = listener
+    return True
+
+
+def quick_listen_pending():
+    """Return whether this session has a capture waiting to be heard or answered."""
+    return "quick_listener" in st.session_state
+
+
+def is_quick_listening():
+    """Return whether this session's listener is still waiting for speech."""
+    listener = st.session_state.get("quick_listener")
+    return bool(listener) and not listener.done
+
+
+def take_quick_listen_result():
+    """Return ``(finished, audio)`` for this session's capture.
+
+    Once finished the capture is cleared; ``audio`` is None if the listener
+    timed out without hearing a question.
+    """
+    listener = st.session_state.get("quick_listener")
+    if not listener or not listener.done:
+        return False, None
+    del st.session_state["quick_listener"]
+    return True, listener.audio
+
+
+def transcribe_question(audio):
+    """Convert captured question audio to text."""
+    recognizer, _ = _session_microphone()
+    return transcribe_audio(recognizer, audio)
@@ -8,30 +8,25 @@
 Built with Streamlit + OpenAI + gTTS
 """
 
-import importlib.util
-import os
-import platform
-import tempfile
-from textwrap import dedent
-
 import streamlit as st
 
-# ------------------ DEPENDENCY LOAD ------------------
-openai = None
-sr = None
-gTTS = None
-PdfReader = None
-
-if importlib.util.find_spec("openai"):
-    import openai  # type: ignore
-if importlib.util.find_spec("speech_recognition"):
-    import speech_recognition as sr  # type: ignore
-if importlib.util.find_spec("gtts"):
-    from gtts import gTTS  # type: ignore
-if importlib.util.find_spec("pypdf"):
-    from pypdf import PdfReader  # type: ignore
-
-if not all([openai, sr, gTTS, PdfReader]):
+from core import (
+    MODE,
+    QUICK_LISTEN_POLL_SECONDS,
+    extract_resume_text,
+    get_chatgpt_answer,
+    is_quick_listening,
+    quick_listen_pending,
+    replay_last_answer,
+    show_background_errors,
+    start_quick_listen,
+    start_speech_worker,
+    summarize_resume,
+    take_quick_listen_result,
+    transcribe_question,
+)
+
+if not MODE.all_libs_loaded:
     st.warning("⚠️ Some audio or PDF libraries couldn't load (expected in cloud mode).")
 
 
@@ -43,114 +38,117 @@ st.markdown(
 )
 
 
-# ------------------ CONFIGURATION ------------------
-try:
-    openai.api_key = st.secrets["OPENAI_API_KEY"]
-except Exception:
-    openai.api_key = os.getenv("OPENAI_API_KEY", "YOUR_API_KEY_HERE")
+# ------------------ UI RENDERING ------------------
+def render_cloud_ui(resume_context, answer_placeholder):
+    """Text-only question box for hosted deployments without a microphone."""
+    st.warning("☁️ Running in Streamlit Cloud — microphone shortcut not available here.")
+    user_input = st.text_input("💬 Type your question below:")
+    generate_clicked = st.button("Generate Answer")
+    regenerate_clicked = st.button("🔄 Regenerate Answer")
+    if (generate_clicked or regenerate_clicked) and user_input.strip():
+        answer = get_chatgpt_answer(
+            user_input, resume_context, answer_placeholder, regenerate=regenerate_clicked
+        )
+        if answer:
+            answer_placeholder.success(answer)
 
-SYSTEM_PROMPT = dedent(
-    """
-    Consider this is your profile and act as candidate you were in the interview and I will be the
-    interviewer asking you the questions. Send me the answers only when I ask the prompt and
-    coding answers should be different if someone ask the same question again. If its coding send
-    me with brief explanation and time and space complexity and no intros in the starting of the
-    answers.
-    """
-)
 
+def render_local_ui(resume_context, status_placeholder, question_placeholder, answer_placeholder):
+    """Question box plus quick-listen shortcut, with answers spoken aloud."""
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        user_input = st.text_input("💬 Type your question (or use the quick-listen shortcut)")
+    with col2:
+        listen_clicked = st.button("🎯 Quick Listen")
 
-# ------------------ CORE FUNCTIONS ------------------
-def extract_resume_text(uploaded_file):
-    """Extract text from uploaded resume (supports PDF and text)."""
-    try:
-        if uploaded_file.type == "application/pdf":
-            if not PdfReader:
-                st.error("PDF reading is unavailable in this environment.")
-                return None
-            reader = PdfReader(uploaded_file)
-            return "\n".join(page.extract_text() or "" for page in reader.pages)
-        content = uploaded_file.read()
-        return content.decode("utf-8", errors="ignore")
-    except Exception as exc:
-        st.error(f"Could not read resume: {exc}")
-        return None
-
-
-def get_chatgpt_answer(question, resume_text):
-    """Send question + resume context to ChatGPT and return the answer."""
-    if not resume_text:
-        st.warning("Please upload a resume first so responses are contextual.")
-        return None
-    if not openai:
-        st.error("OpenAI package is unavailable. Set it up to generate answers.")
-        return None
-
-    full_prompt = dedent(
-        f"""
-        {SYSTEM_PROMPT}
-
-        Resume summary:
-        {resume_text}
-
-        Interviewer question: {question}
-        """
-    )
-
-    try:
-        response = openai.ChatCompletion.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": full_prompt}],
+    generate_clicked = regenerate_clicked = False
+    if user_input.strip():
+        generate_clicked = st.button("Generate Answer", key="text_generate")
+        regenerate_clicked = st.button("🔄 Regenerate Answer", key="text_regenerate")
+    if generate_clicked or regenerate_clicked:
+        question_placeholder.markdown(f"**📝 Prompt:** {user_input}")
+        speech_queue = start_speech_worker()
+        answer = get_chatgpt_answer(
+            user_input,
+            resume_context,
+            answer_placeholder,
+            speech_queue.put,
+            regenerate=regenerate_clicked,
         )
-        return response.choices[0].message.content.strip()
-    except Exception as exc:
-        st.error(f"OpenAI API Error: {exc}")
-        return None
-
-
-def speak_text(text):
-    """Speak out the text using gTTS (local use only)."""
-    if not gTTS:
-        st.warning("Speech playback is unavailable in this environment.")
-        return
-    try:
-        tts = gTTS(text)
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as fp:
-            tts.save(fp.name)
-            system = platform.system().lower()
-            if system.startswith("win"):
-                os.system(f"start {fp.name}")  # Windows
-            elif system == "darwin":
-                os.system(f"afplay {fp.name}")  # macOS
-            else:
-                os.system(f"xdg-open {fp.name}")  # Linux/other
-    except Exception as exc:
-        st.warning(f"Speech playback not available: {exc}")
-
-
-def listen_and_transcribe():
-    """Listen from mic and convert to text (local only)."""
-    if not sr:
-        st.error("Speech recognition is unavailable in this environment.")
-        return None
-    try:
-        recognizer = sr.Recognizer()
-        with sr.Microphone() as source:
-            st.info("🎙️ Listening via quick shortcut... Speak your question.")
-            audio = recognizer.listen(source, phrase_time_limit=15)
-            st.info("🧠 Converting speech to text...")
-            return recognizer.recognize_google(audio)
-    except Exception as exc:
-        st.error(f"Speech recognition failed: {exc}")
-        return None
-
-
-# ------------------ MODE DETECTION ------------------
-IS_CLOUD = (
-    os.getenv("STREAMLIT_RUNTIME_ENV") == "cloud"
-    or sr is None
-    or not hasattr(sr, "Microphone")
-)
+        speech_queue.put(None)
+        if answer:
+            answer_placeholder.success(f"💬 **AI Answer:** {answer}")
+            status_placeholder.success("✅ Answer displayed and spoken aloud.")
+
+    if listen_clicked:
+        start_quick_listen()
+    if st.button("🔁 Replay Answer"):
+        replay_last_answer()
+    if quick_listen_pending():
+        poll_quick_listen(resume_context)
+    else:
+        render_quick_listen(resume_context)
+
+
+@st.fragment(run_every=QUICK_LISTEN_POLL_SECONDS)
+def poll_quick_listen(resume_context):
+    """Rerun only the quick-listen block until the pending capture is handled.
+
+    The rest of the page stays responsive meanwhile; a full rerun at the end
+    switches back to the static block so idle sessions do not keep polling.
+    """
+    render_quick_listen(resume_context)
+    if not quick_listen_pending():
+        st.rerun()
+
+
+def render_quick_listen(resume_context):
+    """Answer a finished quick-listen capture and show the last voice turn.
+
+    The turn is kept in session state so it survives polling and reruns.
+    """
+    turn = st.session_state.setdefault("quick_listen_turn", {})
+    status_placeholder = st.empty()
+    question_placeholder = st.empty()
+    answer_placeholder = st.empty()
+
+    finished, audio = take_quick_listen_result()
+    if finished and audio is None:
+        turn.clear()
+        turn["error"] = "⌛ No question heard. Press Quick Listen to try again."
+    elif finished:
+        turn.clear()
+        status_placeholder.info("🧠 Converting speech to text...")
+        try:
+            question = transcribe_question(audio)
+        except Exception as exc:
+            question = None
+            turn["error"] = f"❌ Speech recognition failed: {exc}"
+        if question:
+            turn["question"] = question
+            question_placeholder.markdown(f"**🎧 Shortcut captured:** {question}")
+            answer_placeholder.markdown("_Generating answer..._")
+            speech_queue = start_speech_worker()
+            answer = get_chatgpt_answer(
+                question, resume_context, answer_placeholder, speech_queue.put
+            )
+            speech_queue.put(None)
+            if answer:
+                turn["answer"] = answer
+                turn["status"] = "✅ Answer displayed and spoken aloud."
+        else:
+            turn.setdefault("error", "❌ Could not understand speech. Try again.")
+
+    if is_quick_listening():
+        status_placeholder.info("🎙️ Listening via quick shortcut... Speak your question.")
+    elif "error" in turn:
+        status_placeholder.error(turn["error"])
+    elif "status" in turn:
+        status_placeholder.success(turn["status"])
+    if "question" in turn:
+        question_placeholder.markdown(f"**🎧 Shortcut captured:** {turn['question']}")
+    if "answer" in turn:
+        answer_placeholder.success(f"💬 **AI Answer:** {turn['answer']}")
 
 
 # ------------------ MAIN UI ------------------
@@ -165,48 +163,19 @@ if uploaded_resume:
 else:
     resume_text = st.session_state.get("resume_text")
 
+resume_context = summarize_resume(resume_text) if resume_text else None
+
 st.markdown("---")
 st.subheader("2) Ask your interview question")
+show_background_errors()
 status_placeholder = st.empty()
 question_placeholder = st.empty()
 answer_placeholder = st.empty()
 
-if IS_CLOUD:
-    st.warning("☁️ Running in Streamlit Cloud — microphone shortcut not available here.")
-    user_input = st.text_input("💬 Type your question below:")
-    if st.button("Generate Answer") and user_input.strip():
-        with st.spinner("Generating answer..."):
-            answer = get_chatgpt_answer(user_input, resume_text)
-            if answer:
-                answer_placeholder.success(answer)
+if MODE.is_cloud:
+    render_cloud_ui(resume_context, answer_placeholder)
 else:
-    col1, col2 = st.columns([3, 1])
-    with col1:
-        user_input = st.text_input("💬 Type your question (or use the quick-listen shortcut)")
-    with col2:
-        listen_clicked = st.button("🎯 Quick Listen")
-
-    if user_input.strip() and st.button("Generate Answer", key="text_generate"):
-        with st.spinner("Generating answer..."):
-            answer = get_chatgpt_answer(user_input, resume_text)
-            if answer:
-                question_placeholder.markdown(f"**📝 Prompt:** {user_input}")
-                answer_placeholder.success(f"💬 **AI Answer:** {answer}")
-                speak_text(answer)
-                status_placeholder.success("✅ Answer displayed and spoken aloud.")
-
-    if listen_clicked:
-        question = listen_and_transcribe()
-        if question:
-            question_placeholder.markdown(f"**🎧 Shortcut captured:** {question}")
-            answer_placeholder.markdown("_Generating answer..._")
-            answer = get_chatgpt_answer(question, resume_text)
-            if answer:
-                answer_placeholder.success(f"💬 **AI Answer:** {answer}")
-                speak_text(answer)
-                status_placeholder.success("✅ Answer displayed and spoken aloud.")
-        else:
-            status_placeholder.error("❌ Could not understand speech. Try again.")
+    render_local_ui(resume_context, status_placeholder, question_placeholder, answer_placeholder)
 
 st.markdown("---")
 st.caption("Built with ❤️ using Streamlit, OpenAI GPT-4o, and resume-aware context")